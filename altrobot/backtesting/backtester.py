@@ -2,16 +2,17 @@
 # -*- coding: utf-8 -*-
 
 import os
-from typing import List
+from typing import Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
 from sklearn.preprocessing import StandardScaler
 import matplotlib.pyplot as plt
 from matplotlib import style
 
 from backtesting.portfolio import BacktestPortfolio
-from backtesting.policy import Policy, AllInOutPolicy
+from backtesting.policy import Policy
 from utils import progress_bar, load_model
 
 style.use('ggplot')
@@ -26,37 +27,43 @@ class Backtester:
             backtest_subsets: List[dict],
             asset_name: str,
             model_names: List[str],
-            policy: Policy
+            policy: Policy,
+            n_jobs: int = 1
         ):
         self.backtest_subsets = backtest_subsets
         self.asset_name = asset_name
 
         self.model_names = model_names
         self.policy = policy
+        self.n_jobs = n_jobs
 
-        self.y_true = []
-        self.returns = []
-        self.index = []
+        self.index = pd.Index(np.concatenate([subset['y_test'].index for subset in backtest_subsets]))
 
-        for subset in self.backtest_subsets:
-            self.y_true.extend(list(subset['y_test']))
-            self.returns.extend(list(subset['returns_test']))
-            self.index.extend(list(subset['y_test'].index))
+        self.y_true = pd.Series(np.concatenate([subset['y_test'] for subset in backtest_subsets]), index = self.index)
+        self.returns = pd.Series(np.concatenate([subset['returns_test'] for subset in backtest_subsets]), index = self.index)
 
-        self.y_true = pd.Series(self.y_true, index = self.index)
-        self.returns = pd.Series(self.returns, index = self.index)
+        self._y_true_np = np.asarray(self.y_true, dtype = np.int8)
+        self._returns_np = np.asarray(self.returns, dtype = np.float64)
+
+        self._subsets_np = [(np.ascontiguousarray(subset['X_train'], dtype = np.float32),
+                             np.asarray(subset['y_train'], dtype = np.float32),
+                             np.ascontiguousarray(subset['X_test'], dtype = np.float32)) for subset in backtest_subsets]
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['backtest_subsets']
+
+        return state
 
     def _benchmark_metrics(self) -> None:
         self.bnh_portfolio = BacktestPortfolio()
 
-        predictions = pd.Series(np.ones(len(self.y_true), dtype = int), index = self.index)
-        benchmark_policy = AllInOutPolicy(bounds = (0.5, 0.5))
-        signals = benchmark_policy.generate_signals(predictions)
+        predictions = np.ones(len(self._y_true_np), dtype = int)
+        signals = predictions
 
-        self.bnh_portfolio.calc_error_metrics(predictions, self.y_true)
-        self.bnh_portfolio.calc_profitability_metrics(signals, self.returns)
-        self.bnh_portfolio.calc_conf_matrix(predictions, self.y_true)
-        self.bnh_portfolio.calc_conf_matrix_prof(predictions, self.y_true, self.returns)
+        self.bnh_portfolio.calc_error_metrics(predictions, self._y_true_np)
+        self.bnh_portfolio.calc_profitability_metrics(signals, self._returns_np)
+        self.bnh_portfolio.calc_conf_matrix_prof(predictions, self._y_true_np, self._returns_np)
 
     def _export_aggregated_reports(
             self,
@@ -86,32 +93,94 @@ class Backtester:
 
     def _predict(
             self,
-            model_name: str
-        ) -> None:
-        n = len(self.backtest_subsets)
+            model_name: str,
+            show_progress: bool = True
+        ) -> Tuple[pd.Series, pd.Series]:
+        n = len(self._subsets_np)
         i = 0
 
+        all_predicted_probs = []
+        all_predictions = []
+
         model = load_model(model_name)
         model.compile(optimizer = 'sgd', loss = 'binary_crossentropy', metrics = ['accuracy'])
 
-        progress_bar(0, n, prefix = f'{model_name}:', length = 20)
+        if show_progress:
+            progress_bar(0, n, prefix = f'{model_name}:', length = 20)
 
-        for subset in self.backtest_subsets:
-            model.fit(subset['X_train'], subset['y_train'], batch_size = 100, epochs = 100, verbose = 0)
+        for X_train, y_train, X_test in self._subsets_np:
+            model.fit(X_train, y_train, batch_size = 100, epochs = 100, verbose = 0)
 
-            predicted_probs = model.predict(subset['X_test'])[:, 0]
+            predicted_probs = model.predict(X_test)[:, 0]
 
-            self.predicted_probs[model_name].extend(list(predicted_probs))
-            self.predictions[model_name].extend([1 if p >= 0.5 else 0 for p in predicted_probs])
+            all_predicted_probs.append(predicted_probs)
+            all_predictions.append(np.where(predicted_probs >= 0.5, 1, 0))
 
-            progress_bar(i, n, prefix = f'{model_name}:', length = 20)
+            if show_progress:
+                progress_bar(i, n, prefix = f'{model_name}:', length = 20)
             i += 1
 
-        progress_bar(n, n, prefix = f'{model_name}:', length = 20)
-        print()
+        if show_progress:
+            progress_bar(n, n, prefix = f'{model_name}:', length = 20)
+            print()
 
-        self.predicted_probs[model_name] = pd.Series(self.predicted_probs[model_name], index = self.index)
-        self.predictions[model_name] = pd.Series(self.predictions[model_name], index = self.index)
+        return pd.Series(np.concatenate(all_predicted_probs), index = self.index), pd.Series(np.concatenate(all_predictions), index = self.index)
+
+    def _run(
+            self,
+            i: int,
+            n_jobs: int,
+            sequential: bool = True
+        ) -> Tuple[Dict[str, BacktestPortfolio], Dict[str, pd.Series], Dict[str, pd.Series]]:
+        portfolios = {model_name: BacktestPortfolio() for model_name in self.model_names}
+        all_predicted_probs = {}
+        all_predictions = {}
+
+        show_progress = sequential and n_jobs == 1
+
+        results = Parallel(n_jobs = n_jobs)(delayed(self._predict)(model_name, show_progress) for model_name in self.model_names)
+
+        for model_name, (predicted_probs, predictions) in zip(self.model_names, results):
+            all_predicted_probs[model_name] = predicted_probs
+            all_predictions[model_name] = predictions
+
+            signals = self.policy.generate_signals(predicted_probs)
+
+            portfolios[model_name].calc_error_metrics(predictions, self._y_true_np)
+            portfolios[model_name].calc_profitability_metrics(signals, self._returns_np, self.bnh_portfolio.annualized_return)
+            portfolios[model_name].calc_conf_matrix_prof(predictions, self._y_true_np, self._returns_np)
+
+        if sequential:
+            print()
+
+        index = pd.Index(['Buy & Hold'] + self.model_names, name = 'Model name')
+
+        error_metrics_report = pd.DataFrame([self.bnh_portfolio.error_metrics]
+                                + [portfolios[model_name].error_metrics for model_name in self.model_names],
+                                columns = ['Accuracy', 'Precision', 'Recall', 'F1 Score', 'PT p-value'],
+                                index = index)
+
+        profitability_metrics_report = pd.DataFrame([self.bnh_portfolio.profitability_metrics]
+                                + [portfolios[model_name].profitability_metrics for model_name in self.model_names],
+                                columns = ['CR', 'AR', 'AV', 'SR', 'IR'], 
+                                index = index)
+
+        conf_matrix_report = pd.DataFrame([self.bnh_portfolio.conf_matrix]
+                                + [portfolios[model_name].conf_matrix for model_name in self.model_names], 
+                                columns = ['TP', 'TN', 'FP', 'FN'], 
+                                index = index)
+
+        conf_matrix_prof_report = pd.DataFrame([self.bnh_portfolio.conf_matrix_prof]
+                                + [portfolios[model_name].conf_matrix_prof for model_name in self.model_names], 
+                                columns = ['TP', 'TN', 'FP', 'FN'], 
+                                index = index)
+
+        error_metrics_report.to_csv(f'{self.RESULTS_PATH + self.asset_name}_err_{str(i)}.csv')
+        profitability_metrics_report.to_csv(f'{self.RESULTS_PATH + self.asset_name}_prof_{str(i)}.csv')
+        conf_matrix_report.to_csv(f'{self.RESULTS_PATH + self.asset_name}_conf_mat_{str(i)}.csv')
+        conf_matrix_prof_report.to_csv(f'{self.RESULTS_PATH + self.asset_name}_conf_mat_prof_{str(i)}.csv')
+
+        return portfolios, all_predicted_probs, all_predictions
 
     def plot_CR(self) -> None:
         plt.plot(self.bnh_portfolio.cumulative_return, label = 'Buy & Hold')
@@ -128,7 +197,8 @@ class Backtester:
 
     def test(
             self,
-            n: int
+            n: int,
+            parallel_runs: bool = False
         ) -> None:
         if not os.path.isdir(self.RESULTS_PATH):
             os.mkdir(self.RESULTS_PATH)
@@ -137,52 +207,12 @@ class Backtester:
 
         print(f'Training {len(self.model_names)} model(s) {n} time(s) each:\n')
 
-        for i in range(n):
-            self.portfolios = {model_name: BacktestPortfolio() for model_name in self.model_names}
-            self.predictions = {model_name: [] for model_name in self.model_names}
-            self.predicted_probs = {model_name: [] for model_name in self.model_names}
-
-            for model_name in self.model_names:
-                self._predict(model_name)
-
-                signals = self.policy.generate_signals(self.predicted_probs[model_name])
-
-                self.portfolios[model_name].calc_error_metrics(self.predictions[model_name], self.y_true)
-                self.portfolios[model_name].calc_profitability_metrics(signals, self.returns, self.bnh_portfolio.annualized_return)
-                self.portfolios[model_name].calc_conf_matrix(self.predictions[model_name], self.y_true)
-                self.portfolios[model_name].calc_conf_matrix_prof(self.predictions[model_name], self.y_true, self.returns)
-
-            print()
+        if parallel_runs:
+            runs = Parallel(n_jobs = self.n_jobs)(delayed(self._run)(i, 1, False) for i in range(n))
+        else:
+            runs = [self._run(i, self.n_jobs) for i in range(n)]
 
-            error_metrics_report = pd.DataFrame([self.bnh_portfolio.error_metrics]
-                                    + [self.portfolios[model_name].error_metrics for model_name in self.model_names],
-                                    columns = ['Accuracy', 'Precision', 'Recall', 'F1 Score', 'PT p-value'],
-                                    index = ['Buy & Hold'] + self.model_names)
-
-            profitability_metrics_report = pd.DataFrame([self.bnh_portfolio.profitability_metrics]
-                                    + [self.portfolios[model_name].profitability_metrics for model_name in self.model_names],
-                                    columns = ['CR', 'AR', 'AV', 'SR', 'IR'], 
-                                    index = ['Buy & Hold'] + self.model_names)
-
-            conf_matrix_report = pd.DataFrame([self.bnh_portfolio.conf_matrix]
-                                    + [self.portfolios[model_name].conf_matrix for model_name in self.model_names], 
-                                    columns = ['TP', 'TN', 'FP', 'FN'], 
-                                    index = ['Buy & Hold'] + self.model_names)
-
-            conf_matrix_prof_report = pd.DataFrame([self.bnh_portfolio.conf_matrix_prof]
-                                    + [self.portfolios[model_name].conf_matrix_prof for model_name in self.model_names], 
-                                    columns = ['TP', 'TN', 'FP', 'FN'], 
-                                    index = ['Buy & Hold'] + self.model_names)            
-
-            error_metrics_report.index.name = 'Model name'
-            profitability_metrics_report.index.name = 'Model name'
-            conf_matrix_report.index.name = 'Model name'
-            conf_matrix_prof_report.index.name = 'Model name'
-
-            error_metrics_report.to_csv(f'{self.RESULTS_PATH + self.asset_name}_err_{str(i)}.csv')
-            profitability_metrics_report.to_csv(f'{self.RESULTS_PATH + self.asset_name}_prof_{str(i)}.csv')
-            conf_matrix_report.to_csv(f'{self.RESULTS_PATH + self.asset_name}_conf_mat_{str(i)}.csv')
-            conf_matrix_prof_report.to_csv(f'{self.RESULTS_PATH + self.asset_name}_conf_mat_prof_{str(i)}.csv')
+        self.portfolios, self.predicted_probs, self.predictions = runs[-1]
 
         self._export_aggregated_reports(n)
 
@@ -35,17 +35,15 @@ class AllInOutPolicy(Policy):
         lower_bound = self.bounds[0]
         upper_bound = self.bounds[1]
 
-        signals = []
+        signals = np.empty(len(predicted_probs), dtype = int)
+        signal = 0
 
-        for p in predicted_probs:
+        for i, p in enumerate(predicted_probs):
             if p >= upper_bound:
-                signals.append(1)
+                signal = 1
             elif p < lower_bound:
-                signals.append(0)
-            else:
-                if len(signals) == 0:
-                    signals.append(0)
-                else:
-                    signals.append(signals[-1])
-        
-        return np.array(signals)
+                signal = 0
+
+            signals[i] = signal
+
+        return signals
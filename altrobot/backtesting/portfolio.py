@@ -4,7 +4,7 @@
 import numpy as np
 import pandas as pd
 from scipy.stats import norm
-from sklearn.metrics import confusion_matrix, accuracy_score, precision_score, recall_score, f1_score
+from sklearn.metrics import confusion_matrix
 
 
 class BacktestPortfolio:
@@ -15,14 +15,14 @@ class BacktestPortfolio:
 
     def _PT_test(
             self,
-            predictions: pd.Series,
-            y_true: pd.Series
+            predictions: np.ndarray,
+            y_true: np.ndarray,
+            pyz: float
         ) -> float:
         n = len(y_true)
-        pyz = accuracy_score(predictions, y_true)
 
-        py = len(y_true[y_true == 1].dropna()) / n
-        pz = len(predictions[predictions == 1].dropna()) / n
+        py = np.count_nonzero(y_true == 1) / n
+        pz = np.count_nonzero(predictions == 1) / n
 
         p_star = py * pz + (1 - py) * (1 - pz)
         u = p_star * (1 - p_star) / n
@@ -44,32 +44,24 @@ class BacktestPortfolio:
             signals: np.ndarray,
             returns: pd.Series
         ) -> None:
-        self.realized_returns = np.multiply(signals, np.array(returns))
+        self.realized_returns = np.multiply(signals, np.asarray(returns))
 
-    def _CR(
-            self,
-            signals: np.ndarray,
-            returns: pd.Series
-        ) -> None:
-        cumulative_return = [1]
+    def _CR(self) -> None:
+        cumulative_return = np.empty(len(self.realized_returns) + 1)
+        cumulative_return[0] = 1.0
 
-        for i in zip(signals, returns):
-            s = i[0]
-            r = i[1]
+        np.add(self.realized_returns, 1.0, out = cumulative_return[1:])
+        np.cumprod(cumulative_return, out = cumulative_return)
+        cumulative_return -= 1.0
 
-            cr = cumulative_return[-1]
-
-            cumulative_return.append(cr + (cr * s * r))
-
-        self.cumulative_return = pd.Series(cumulative_return) - 1
+        self.total_return = float(cumulative_return[-1])
+        self.cumulative_return = pd.Series(cumulative_return)
 
     def _AR(
             self,
             N: int
         ) -> None:
-        CR = self.cumulative_return.iloc[-1]
-
-        self.annualized_return = np.power(1 + float(CR), 252 / N) - 1
+        self.annualized_return = np.power(1 + self.total_return, 252 / N) - 1
 
     def _AV(self) -> None:
         self.annualized_volatiliy = float(self.realized_returns.std() * np.sqrt(252))
@@ -82,7 +74,7 @@ class BacktestPortfolio:
             returns: pd.Series,
             bnh_AR: float
         ) -> None:
-        traking_error = float((self.realized_returns - returns).std() * np.sqrt(252))
+        traking_error = float(np.std(self.realized_returns - np.asarray(returns), ddof = 1) * np.sqrt(252))
 
         self.information_ratio = (self.annualized_return - bnh_AR) / traking_error
 
@@ -91,11 +83,17 @@ class BacktestPortfolio:
             predictions: pd.Series,
             y_true: pd.Series
         ) -> None:
-        self.accuracy = accuracy_score(predictions, y_true)
-        self.precision = recall_score(predictions, y_true)
-        self.recall = precision_score(predictions, y_true)
-        self.f1 = f1_score(predictions, y_true)
-        self.pt_pval = self._PT_test(predictions, y_true)
+        predictions = np.asarray(predictions)
+        y_true = np.asarray(y_true)
+
+        self.calc_conf_matrix(predictions, y_true)
+        TP, TN, FP, FN = self.conf_matrix
+
+        self.accuracy = (TP + TN) / len(y_true)
+        self.precision = TP / (TP + FP) if TP + FP else 0.0
+        self.recall = TP / (TP + FN) if TP + FN else 0.0
+        self.f1 = 2 * TP / (2 * TP + FP + FN) if TP else 0.0
+        self.pt_pval = self._PT_test(predictions, y_true, self.accuracy)
 
         self.error_metrics = np.array([self.accuracy, self.precision, self.recall, self.f1, round(self.pt_pval, 6)])
 
@@ -107,7 +105,7 @@ class BacktestPortfolio:
         ) -> None:
         self._realized_returns(signals, returns)
 
-        self._CR(signals, returns)
+        self._CR()
         self._AR(len(returns))
         self._AV()
         self._SR()
@@ -117,7 +115,7 @@ class BacktestPortfolio:
         else:
             self.information_ratio = 0
 
-        self.profitability_metrics = np.array([float(self.cumulative_return.iloc[-1]),
+        self.profitability_metrics = np.array([self.total_return,
                                                      self.annualized_return,
                                                      self.annualized_volatiliy,
                                                      self.sharpe_ratio,
@@ -128,7 +126,7 @@ class BacktestPortfolio:
             predictions: pd.Series,
             y_true: pd.Series
         ) -> None:
-        conf_matrix = confusion_matrix(predictions, y_true)
+        conf_matrix = confusion_matrix(predictions, y_true, labels = [0, 1])
 
         self.conf_matrix = np.array([conf_matrix[1][1], conf_matrix[0][0], conf_matrix[1][0], conf_matrix[0][1]])
 
@@ -3,7 +3,6 @@
 
 from typing import Tuple
 
-import numpy as np
 import pandas as pd
 import ta
 
@@ -42,11 +41,7 @@ class FeatureConstructor:
             self,
             returns: pd.Series
         ) -> pd.Series:
-        y = np.sign(returns)
-        y[y == 0] = 1
-        y[y == -1] = 0
-
-        return y
+        return (returns >= 0).astype(int)
 
     def _technical_indicators(self) -> pd.DataFrame:
         close = self.dataset['Adj Close']
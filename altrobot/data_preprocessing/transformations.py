@@ -15,28 +15,23 @@ def generate_backtest_subsets(
 		training_size: int,
 		window: int
 	) -> List[dict]:
-	backtest_subsets = []
 	n = len(X)
-	i = 0
+	starts = np.arange(0, n - training_size - window + 1, window)
 
-	while i + training_size + window <= n:
-		backtest_subsets.append({
-			'X_train': X[i:i + training_size],
-			'X_test': X[i + training_size:i + training_size + window],
-			'y_train': y[i:i + training_size],
-			'y_test': y[i + training_size:i + training_size + window],
-			'returns_train': returns[i:i + training_size],
-			'returns_test': returns[i + training_size:i + training_size + window]
-		})
+	train_idx = np.column_stack((starts, starts + training_size))
+	test_idx = np.column_stack((starts + training_size, starts + training_size + window))
 
-		i += window
-	
 	if len(y) % window != 0:
-		i -= window
+		test_idx[-1, 1] = n
 
-		backtest_subsets[-1]['X_test'] = X[i + training_size:len(X)]
-		backtest_subsets[-1]['y_test'] = y[i + training_size:len(y)]
-		backtest_subsets[-1]['returns_test'] = returns[i + training_size:len(returns)]
+	backtest_subsets = [{
+		'X_train': X[train_start:train_end],
+		'X_test': X[test_start:test_end],
+		'y_train': y[train_start:train_end],
+		'y_test': y[test_start:test_end],
+		'returns_train': returns[train_start:train_end],
+		'returns_test': returns[test_start:test_end]
+	} for (train_start, train_end), (test_start, test_end) in zip(train_idx.tolist(), test_idx.tolist())]
 
 	return backtest_subsets
 
@@ -71,15 +66,24 @@ def standardize(backtest_subsets: List[dict]) -> List[dict]:
 
 	for subset in backtest_subsets:
 		subset['X_train'] = scaler.fit_transform(subset['X_train'])
-		subset['X_test'] = scaler.fit_transform(subset['X_test'])
+		subset['X_test'] = scaler.transform(subset['X_test'])
 
 	return backtest_subsets
 
 def standardize_LSTM(backtest_subsets: List[dict]) -> List[dict]:
-	scaler = StandardScaler()
-
 	for subset in backtest_subsets:
-		subset['X_train'] = np.array([scaler.fit_transform(timeframe) for timeframe in subset['X_train']])
-		subset['X_test'] = np.array([scaler.fit_transform(timeframe) for timeframe in subset['X_test']])
+		for key in ('X_train', 'X_test'):
+			timeframes = subset[key]
+
+			n = timeframes.shape[1]
+			eps = np.finfo(np.float64).eps
+
+			mean = timeframes.mean(axis = 1, keepdims = True)
+			var = timeframes.var(axis = 1, keepdims = True)
+
+			std = np.sqrt(var)
+			std[var <= n * eps * var + (n * mean * eps) ** 2] = 1
+
+			subset[key] = (timeframes - mean) / std
 	
 	return backtest_subsets
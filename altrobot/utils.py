@@ -2,11 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
+import sys
+from typing import TYPE_CHECKING
 
 import pandas as pd
 import pandas_datareader.data as pdr
-from tensorflow.keras.models import Sequential, model_from_json
+
+if TYPE_CHECKING:
+    from tensorflow.keras.models import Sequential
 
 
 KERAS_MODELS_ARCHITECTURES_PATH = 'resources/keras_models_architectures/'
@@ -16,24 +19,27 @@ BANNER_PATH = 'resources/banner'
 
 def show_banner():
     with open(BANNER_PATH, 'r') as f:
-        for line in f:
-            print(line.splitlines()[0])
+        sys.stdout.write(f.read())
+
+    sys.stdout.flush()
+
 
+def load_model(model_name: str) -> 'Sequential':
+    from tensorflow.keras.models import model_from_json
 
-def load_model(model_name: str) -> Sequential:
     with open(f'{KERAS_MODELS_ARCHITECTURES_PATH + model_name}.json') as f:
-        return model_from_json(json.load(f))
+        return model_from_json(f.read())
 
 
 def save_model_architecture(
-        model: Sequential,
+        model: 'Sequential',
         name: str
     ) -> None:
     if os.path.exists(f'{KERAS_MODELS_ARCHITECTURES_PATH + name}.json'):
         raise ValueError(f'Model with name: {name} already exists')
 
     with open(f'{KERAS_MODELS_ARCHITECTURES_PATH + name}.json', 'w') as f:
-        json.dump(model.to_json(), f)
+        f.write(model.to_json())
 
 
 def fetch_dataset(
@@ -42,10 +48,19 @@ def fetch_dataset(
         end: str,
         save: bool = False
     ) -> pd.DataFrame:
+    dataset_path = f'{DATASETS_PATH + symbol}.dat'
+
+    if os.path.exists(dataset_path):
+        dataset = pd.read_csv(dataset_path, parse_dates = ['Date'])
+        dates = dataset['Date']
+
+        if dates.iloc[0] <= pd.Timestamp(start) and dates.iloc[-1] >= pd.Timestamp(end):
+            return dataset[(dates >= start) & (dates <= end)].reset_index(drop = True)
+
     dataset = pdr.DataReader(symbol, 'yahoo', start, end)
 
     if save:
-        dataset.to_csv(f'{DATASETS_PATH + symbol}.dat')
+        dataset.to_csv(dataset_path)
 
     return dataset.reset_index()
 
@@ -59,11 +74,22 @@ def progress_bar(
         length: int = 100,
         fill: str = '█'
     ) -> None:
-    percent = ("{0:." + str(decimals) + "f}").format(100 * (iteration / float(total)))
+    percent = f'{100 * (iteration / float(total)):.{decimals}f}'
     filled_length = int(length * iteration // total)
-    bar = fill * filled_length + ' ' * (length - filled_length)
+    state = (prefix, suffix, percent, filled_length, length, fill)
+
+    if state != progress_bar.last_state:
+        progress_bar.last_state = state
+        bar = fill * filled_length + ' ' * (length - filled_length)
 
-    print('\r%s |%s| %s%% %s' % (prefix, bar, percent, suffix), end = '\r')
+        sys.stdout.write('\r%s |%s| %s%% %s\r' % (prefix, bar, percent, suffix))
+        sys.stdout.flush()
 
     if iteration == total:
-        print()
+        progress_bar.last_state = None
+
+        sys.stdout.write('\n')
+        sys.stdout.flush()
+
+
+progress_bar.last_state = None